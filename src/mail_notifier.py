@@ -1,24 +1,41 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from logging.handlers import RotatingFileHandler
+from imapclient.exceptions import IMAPClientAbortError, IMAPClientError, LoginError
+from imapclient.imapclient import require_capability
+from imapclient.tls import IMAP4_TLS
 from imapclient import IMAPClient
 from pystray import MenuItem as item
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+from functools import partial
 from dotenv import load_dotenv
+from urllib.parse import urlencode
 from ast import literal_eval
 from PIL import Image
 import webbrowser
 import threading
+import hashlib
+import imaplib
+import urllib.request
+import json
 import winsound
 import pystray
 import logging
 import keyring
+import socket
+import random
+import math
 import time
 import yaml
+import zlib
 import ssl
 import sys
 import os
 
 
+# Let imaplib know about RFC 4978 COMPRESS command
+if "COMPRESS" not in imaplib.Commands:
+    imaplib.Commands["COMPRESS"] = ("AUTH", "SELECTED")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -64,6 +81,23 @@ DEFAULT_CONFIG = {
     # Mailboxes config
     'mailboxes': [],
     'check_interval': 60,
+    'schedule_jitter': 0.05,  # Random shift of each check, as a fraction of check_interval
+    'startup_ramp': 30,  # Seconds to spread the first checks over after start
+    'dns_cache_ttl': 300,  # Seconds to keep resolved IMAP host addresses
+    'oauth_refresh_margin': 300,  # Refresh OAuth2 access tokens this many seconds before expiry
+
+    # Per host limits, 'default' applies to every host, other keys override it for one host
+    'host_limits': {
+        'default': {
+            'failure_threshold': 3,      # Consecutive failures before host circuit opens
+            'reset_timeout': 120,        # Seconds before one mailbox probes an open host
+            'logins_per_minute': 10,
+            'login_burst': 5,
+            'commands_per_minute': 120,
+            'command_burst': 30,
+            'max_wait': 30,              # Max seconds to wait for a token, else skip the check
+        },
+    },
 
     # Sound notifications
     'sound_enabled': True,
@@ -111,6 +145,9 @@ def get_password(email: str) -> Optional[str]:
     return password
 
 
+OAUTH_METHODS = ('xoauth2', 'oauthbearer')
+
+
 def prepare_mailboxes(mailboxes: List[Dict[str, str]]) -> None:
     """Safe storage and checking of passwords"""
     load_dotenv()  # Load environment variables from .env file
@@ -125,13 +162,41 @@ def prepare_mailboxes(mailboxes: List[Dict[str, str]]) -> None:
             email = mail.get('email', 'unknown')
             logging.error(f"Invalid mailbox config for {email}: missing keys {missing_keys}")
             raise ValueError(f"Invalid mailbox config for {email}: missing keys {missing_keys}")
-        
+
+        auth = mail.get('auth', 'password')
+        if auth != 'password' and auth not in OAUTH_METHODS:
+            logging.error(f"Invalid mailbox config for {mail['email']}: unknown auth {auth}")
+            raise ValueError(f"Invalid mailbox config for {mail['email']}: unknown auth {auth}")
+        if auth in OAUTH_METHODS:
+            oauth = mail.get('oauth') or {}
+            missing_keys = [key for key in ['token_url', 'client_id'] if key not in oauth]
+            if missing_keys:
+                logging.error(f"Invalid oauth config for {mail['email']}: missing keys {missing_keys}")
+                raise ValueError(f"Invalid oauth config for {mail['email']}: missing keys {missing_keys}")
+            if 'client_secret' in oauth:
+                logging.error(f"Invalid oauth config for {mail['email']}: client_secret belongs in .env")
+                raise ValueError(f"Invalid oauth config for {mail['email']}: client_secret belongs in .env")
+
+        # Password, or refresh token for OAuth2 mailboxes
         env_value = os.getenv(mail['email'])
 
         if env_value is None:
             logging.error(f"Missing .env entry for {mail['email']}")
             sys.exit(1)
 
+        if auth in OAUTH_METHODS:
+            # Client secret of confidential clients, optional
+            client_secret = os.getenv(f"{mail['email']}:client_secret")
+            if client_secret is not None:
+                keyring.set_password("email_notifier_client_secret", mail['email'], client_secret)
+            elif keyring.get_password("email_notifier_client_secret", mail['email']) is not None:
+                keyring.delete_password("email_notifier_client_secret", mail['email'])
+
+            # Token endpoint may rotate refresh token, keep rotated one unless .env was changed
+            if keyring.get_password("email_notifier_oauth_seed", mail['email']) == env_value:
+                continue
+            keyring.set_password("email_notifier_oauth_seed", mail['email'], env_value)
+
         keyring.set_password("email_notifier", mail['email'], env_value)
 
 
@@ -142,6 +207,481 @@ CHECK_INTERVAL: int = config['check_interval']
 prepare_mailboxes(MAILBOXES)
 
 
+class ConnectionFactory:
+    """Shared IMAP connection setup: one SSL context, DNS cache and TLS session reuse."""
+
+    def __init__(self, dns_ttl: float = 300):
+        self.ssl_context = ssl.create_default_context()
+        self.dns_ttl = dns_ttl
+        self.lock = threading.Lock()
+        self.dns_cache: Dict[Tuple[str, int], Tuple[float, list]] = {}
+        self.tls_sessions: Dict[Tuple[str, int], ssl.SSLSession] = {}
+        self.stats = {'handshakes': 0, 'handshake_time': 0.0, 'resumed': 0, 'resumed_time': 0.0,
+                      'compressed': 0, 'wire_in': 0, 'raw_in': 0, 'wire_out': 0, 'raw_out': 0,
+                      'compressed_raw': 0, 'compressed_wire': 0}
+
+    def resolve(self, host: str, port: int) -> list:
+        """Resolve host address, using cached result while it is fresh."""
+        key = (host, port)
+        now = time.monotonic()
+        with self.lock:
+            cached = self.dns_cache.get(key)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        with self.lock:
+            self.dns_cache[key] = (now + self.dns_ttl, addresses)
+        return addresses
+
+    def forget(self, host: str, port: int):
+        """Drop cached DNS result and TLS session for a host."""
+        with self.lock:
+            self.dns_cache.pop((host, port), None)
+            self.tls_sessions.pop((host, port), None)
+
+    def open_socket(self, host: str, port: int, timeout: Optional[float] = None) -> ssl.SSLSocket:
+        """Open TLS socket to host, resuming a previous TLS session if one is cached."""
+        sock = None
+        last_error: Optional[OSError] = None
+        for family, type_, proto, _, address in self.resolve(host, port):
+            try:
+                sock = socket.socket(family, type_, proto)
+                sock.settimeout(timeout)
+                sock.connect(address)
+                break
+            except OSError as e:
+                last_error = e
+                if sock is not None:
+                    sock.close()
+                sock = None
+
+        if sock is None:
+            self.forget(host, port)  # Address may be stale, resolve again next time
+            raise last_error or OSError(f"No addresses found for {host}")
+
+        with self.lock:
+            session = self.tls_sessions.get((host, port))
+        start = time.perf_counter()
+        try:
+            tls_sock = self.ssl_context.wrap_socket(sock, server_hostname=host, session=session)
+        except Exception:
+            sock.close()
+            self.forget(host, port)
+            raise
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            if tls_sock.session_reused:
+                self.stats['resumed'] += 1
+                self.stats['resumed_time'] += elapsed
+            else:
+                self.stats['handshakes'] += 1
+                self.stats['handshake_time'] += elapsed
+        logging.debug(f"TLS to {host}: {'resumed' if tls_sock.session_reused else 'full handshake'} "
+                      f"in {elapsed * 1000:.1f} ms")
+        self.store_session(host, port, tls_sock)
+        return tls_sock
+
+    def store_session(self, host: str, port: int, tls_sock: ssl.SSLSocket):
+        """Remember TLS session of a socket for later resumption."""
+        # With TLS 1.3 the session ticket arrives after the handshake,
+        # so this is called again once the server greeting has been read
+        session = tls_sock.session
+        if session is not None and (session.has_ticket or session.id):
+            with self.lock:
+                self.tls_sessions[(host, port)] = session
+
+    def record_traffic(self, connection: 'FactoryIMAP4TLS'):
+        """Add byte counters of a closed connection to statistics."""
+        with self.lock:
+            self.stats['compressed'] += connection.decompressor is not None
+            self.stats['wire_in'] += connection.wire_in
+            self.stats['raw_in'] += connection.raw_in
+            self.stats['wire_out'] += connection.wire_out
+            self.stats['raw_out'] += connection.raw_out
+            if connection.decompressor is not None:
+                # Saving is measured on compressed sessions only
+                self.stats['compressed_raw'] += connection.raw_in + connection.raw_out
+                self.stats['compressed_wire'] += connection.wire_in + connection.wire_out
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get TLS handshake and traffic statistics."""
+        with self.lock:
+            return dict(self.stats)
+
+    def log_stats(self):
+        """Log average full handshake time vs. resumed handshake time and traffic saved by compression."""
+        stats = self.get_stats()
+        if not stats['handshakes'] and not stats['resumed']:
+            return
+        full_avg = stats['handshake_time'] / stats['handshakes'] * 1000 if stats['handshakes'] else 0
+        resumed_avg = stats['resumed_time'] / stats['resumed'] * 1000 if stats['resumed'] else 0
+        logging.info(f"TLS: {stats['handshakes']} full handshakes (avg {full_avg:.1f} ms), "
+                     f"{stats['resumed']} resumed (avg {resumed_avg:.1f} ms)")
+
+        raw = stats['raw_in'] + stats['raw_out']
+        wire = stats['wire_in'] + stats['wire_out']
+        compressed_raw = stats['compressed_raw']
+        saved = (1 - stats['compressed_wire'] / compressed_raw) * 100 if compressed_raw else 0
+        logging.info(f"IMAP traffic: {raw} bytes before compression, {wire} bytes on wire; "
+                     f"{stats['compressed']} compressed sessions: {compressed_raw} -> "
+                     f"{stats['compressed_wire']} bytes ({saved:.1f}% saved)")
+
+
+class FactoryIMAP4TLS(IMAP4_TLS):
+    """IMAP4 over TLS with sockets opened by ConnectionFactory and optional DEFLATE compression."""
+    INFLATE_CHUNK = 65536  # Max bytes inflated at once, guards against decompression bombs
+
+    def __init__(self, host: str, port: int, factory: ConnectionFactory, timeout: Optional[float] = None):
+        self.factory = factory
+        self.compressor = None
+        self.decompressor = None
+        self.inflated = b''
+        # Bytes as seen by IMAP (raw) and bytes passed to TLS socket (wire)
+        self.raw_in = self.raw_out = self.wire_in = self.wire_out = 0
+        super().__init__(host, port, factory.ssl_context, timeout)
+
+    def open(self, host: str = "", port: int = 993, timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.sock = self.factory.open_socket(host, port, timeout if timeout is not None else self._timeout)
+        self.file = self.sock.makefile("rb")
+
+    def start_compression(self):
+        """Compress all further traffic with raw DEFLATE (RFC 4978)."""
+        self.compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        self.decompressor = zlib.decompressobj(-15)
+
+    def inflate(self) -> bool:
+        """Read compressed data from socket into inflated buffer, False on EOF."""
+        # Input or output held back by the size limit comes first
+        data = self.decompressor.decompress(self.decompressor.unconsumed_tail, self.INFLATE_CHUNK)
+        if not data:
+            # read1 returns data already buffered by self.file first, so nothing received
+            # together with the COMPRESS response is lost
+            compressed = self.file.read1(16384)
+            if not compressed:
+                return False
+            self.wire_in += len(compressed)
+            data = self.decompressor.decompress(compressed, self.INFLATE_CHUNK)
+        self.inflated += data
+        return True
+
+    def read(self, size: int) -> bytes:
+        if self.decompressor is None:
+            data = self.file.read(size)
+            self.wire_in += len(data)
+        else:
+            while len(self.inflated) < size and self.inflate():
+                pass
+            data, self.inflated = self.inflated[:size], self.inflated[size:]
+        self.raw_in += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        max_line = imaplib._MAXLINE
+        if self.decompressor is None:
+            line = self.file.readline(max_line + 1)
+            self.wire_in += len(line)
+        else:
+            while b'\n' not in self.inflated and len(self.inflated) <= max_line and self.inflate():
+                pass
+            end = self.inflated.find(b'\n') + 1 or len(self.inflated)
+            end = min(end, max_line + 1)
+            line, self.inflated = self.inflated[:end], self.inflated[end:]
+        self.raw_in += len(line)
+        if len(line) > max_line:
+            raise self.error(f"got more than {max_line} bytes")
+        return line
+
+    def send(self, data) -> None:
+        self.raw_out += len(data)
+        if self.compressor is not None:
+            data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.wire_out += len(data)
+        self.sock.sendall(data)
+
+    def shutdown(self) -> None:
+        if self.file.closed:
+            return super().shutdown()  # Already closed, traffic is recorded
+        self.factory.record_traffic(self)
+        logging.debug(f"{self.host}: {self.raw_in + self.raw_out} bytes before compression, "
+                      f"{self.wire_in + self.wire_out} bytes on wire")
+        super().shutdown()
+
+
+class FactoryIMAPClient(IMAPClient):
+    """IMAPClient connecting through a shared ConnectionFactory."""
+
+    def __init__(self, host: str, factory: ConnectionFactory, **kwargs):
+        self.factory = factory  # Must be set before IMAPClient connects
+        super().__init__(host, ssl=True, ssl_context=factory.ssl_context, **kwargs)
+        self.factory.store_session(self.host, self.port, self._imap.sock)
+
+    def _create_IMAP4(self):
+        connect_timeout = getattr(self._timeout, "connect", None)
+        return FactoryIMAP4TLS(self.host, self.port, self.factory, connect_timeout)
+
+    @require_capability("COMPRESS=DEFLATE")
+    def compress(self):
+        """Enable DEFLATE compression for the rest of the session (RFC 4978)."""
+        typ, data = self._imap._simple_command("COMPRESS", "DEFLATE")
+        self._checkok("compress", typ, data)
+        self._imap.start_compression()
+        return data[0]
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a host token bucket has no token within the allowed wait."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket, refilled at a fixed rate up to burst size."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout: float = 0, count: int = 1) -> bool:
+        """Take count tokens at once, waiting up to timeout seconds for them."""
+        if self.rate <= 0:
+            return True  # Unlimited
+        count = min(count, self.burst)  # More than burst would never be available
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= count:
+                    self.tokens -= count
+                    return True
+                wait = (count - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def refund(self, count: int = 1):
+        """Return unused tokens."""
+        if self.rate <= 0:
+            return
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + count)
+
+
+class CircuitBreaker:
+    """Host circuit breaker: opens after consecutive failures, then lets one check probe the host."""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, host: str, failure_threshold: int = 3, reset_timeout: float = 120):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check whether a request to the host may proceed."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                logging.info(f"Circuit for {self.host} is half-open, probing")
+            # Only one probe at a time; a probe that never reported back is replaced
+            if self.probe_started is not None and now - self.probe_started < self.reset_timeout:
+                return False
+            self.probe_started = now
+            return True
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self.lock:
+            if self.state != self.CLOSED:
+                logging.info(f"Circuit for {self.host} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_started = None
+
+    def release(self):
+        """Free the probe slot when a check ended without reaching the host."""
+        with self.lock:
+            self.probe_started = None
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit when threshold is reached."""
+        with self.lock:
+            self.failures += 1
+            self.probe_started = None
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning(f"Circuit for {self.host} opened after {self.failures} failures, "
+                                    f"next probe in {self.reset_timeout}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class HostLimiter:
+    """Circuit breaker and login/command rate limits shared by all mailboxes on one host."""
+
+    def __init__(self, host: str, limits: dict):
+        self.host = host
+        self.max_wait = limits['max_wait']
+        self.circuit = CircuitBreaker(host, limits['failure_threshold'], limits['reset_timeout'])
+        self.logins = TokenBucket(limits['logins_per_minute'], limits['login_burst'])
+        self.commands = TokenBucket(limits['commands_per_minute'], limits['command_burst'])
+
+    def acquire_check(self, commands: int):
+        """Reserve login and all command tokens of one check before connecting.
+
+        Raise RateLimitExceeded if they are not available in time, nothing is spent then.
+        """
+        if not self.commands.acquire(self.max_wait, commands):
+            raise RateLimitExceeded(f"Command rate limit for {self.host}")
+        if not self.logins.acquire(self.max_wait):
+            self.commands.refund(commands)
+            raise RateLimitExceeded(f"Login rate limit for {self.host}")
+
+
+def get_host_limits(host: str) -> dict:
+    """Get host limits from config: defaults merged with host specific overrides."""
+    host_limits = config.get('host_limits') or {}
+    return {
+        **DEFAULT_CONFIG['host_limits']['default'],
+        **(host_limits.get('default') or {}),
+        **(host_limits.get(host) or {}),
+    }
+
+
+class OAuthTokenCache:
+    """In-memory OAuth2 access tokens, refreshed in background thread before they expire."""
+
+    def __init__(self, refresh_margin: float = 300):
+        self.refresh_margin = refresh_margin
+        self.mailboxes: Dict[str, dict] = {}
+        self.tokens: Dict[str, Tuple[str, float]] = {}  # email -> (access token, expiry time)
+        self.refresh_at: Dict[str, float] = {}
+        self.error_counters: Dict[str, int] = {}
+        self.lock = threading.Condition()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def add(self, mailbox: dict):
+        """Register OAuth2 mailbox, its token is fetched by background thread."""
+        with self.lock:
+            self.mailboxes[mailbox['email']] = mailbox
+            self.refresh_at[mailbox['email']] = 0
+            self.error_counters[mailbox['email']] = 0
+
+    def refresh(self, mailbox: dict) -> str:
+        """Fetch new access token from token endpoint using refresh token from keyring."""
+        email = mailbox['email']
+        oauth = mailbox['oauth']
+        refresh_token = get_password(email)
+        if refresh_token is None:
+            raise ValueError(f"Refresh token not found in keyring for {email}")
+
+        params = {'grant_type': 'refresh_token', 'refresh_token': refresh_token, 'client_id': oauth['client_id']}
+        client_secret = keyring.get_password("email_notifier_client_secret", email)
+        if client_secret:
+            params['client_secret'] = client_secret
+        if oauth.get('scope'):
+            params['scope'] = oauth['scope']
+        request = urllib.request.Request(
+            oauth['token_url'],
+            data=urlencode(params).encode('utf-8'),
+            headers={'Content-Type': 'application/x-www-form-urlencoded', 'Accept': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            data = json.loads(response.read().decode('utf-8'))
+
+        access_token = data['access_token']
+        expires_in = float(data.get('expires_in', 3600))
+        if data.get('refresh_token') and data['refresh_token'] != refresh_token:
+            keyring.set_password("email_notifier", email, data['refresh_token'])  # Token was rotated
+
+        now = time.monotonic()
+        with self.lock:
+            self.tokens[email] = (access_token, now + expires_in)
+            # Refresh ahead of expiry, but not more often than every half of token lifetime
+            self.refresh_at[email] = now + expires_in - min(self.refresh_margin, expires_in / 2)
+            self.error_counters[email] = 0
+            self.lock.notify_all()
+        logging.info(f"{email}: OAuth2 access token refreshed, expires in {expires_in:.0f}s")
+        return access_token
+
+    def get_token(self, email: str, wait: float = 10) -> Optional[str]:
+        """Get cached access token, waiting up to wait seconds only if there is no valid one yet."""
+        def valid():
+            return email in self.tokens and self.tokens[email][1] > time.monotonic()
+
+        def refresh_done():
+            # Either new token arrived or refresh failed and was postponed
+            return valid() or self.refresh_at.get(email, 0) > time.monotonic()
+
+        with self.lock:
+            if not refresh_done():
+                # First token or a rejected one is being fetched right now
+                self.wakeup.set()
+                self.lock.wait_for(refresh_done, timeout=wait)
+            return self.tokens[email][0] if valid() else None
+
+    def invalidate(self, email: str):
+        """Drop rejected access token and refresh it at once."""
+        with self.lock:
+            self.tokens.pop(email, None)
+            self.refresh_at[email] = 0
+        self.wakeup.set()
+
+    def run(self):
+        """Refresh tokens which are due, sleeping until next refresh in between."""
+        while self.running:
+            for email, mailbox in list(self.mailboxes.items()):
+                with self.lock:
+                    due = self.refresh_at[email] <= time.monotonic()
+                if not due:
+                    continue
+                try:
+                    self.refresh(mailbox)
+                except Exception as e:
+                    with self.lock:
+                        err_count = self.error_counters[email] + 1
+                        self.error_counters[email] = err_count
+                        wait = min(300, 5 * 2 ** err_count)  # Exponential error retry
+                        self.refresh_at[email] = time.monotonic() + wait
+                        self.lock.notify_all()
+                    logging.error(f"{email}: OAuth2 token refresh failed, will retry in {wait}s: {e}")
+
+            with self.lock:
+                next_refresh = min(self.refresh_at.values(), default=time.monotonic() + 60)
+            self.wakeup.wait(max(1, next_refresh - time.monotonic()))
+            self.wakeup.clear()
+
+    def start(self):
+        """Start background refresh thread."""
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="oauth_refresh", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop background refresh thread."""
+        self.running = False
+        self.wakeup.set()
+
+
 class MailChecker:
     def __init__(self, mailboxes: List[dict]):
         self.mailboxes = mailboxes
@@ -152,30 +692,103 @@ class MailChecker:
         self.executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="mail_checker_")
         self.lock = threading.Lock()
         self.last_check = time.time()
+        self.connections = ConnectionFactory(config.get('dns_cache_ttl', 300))
+        self.hosts = {mb['host']: HostLimiter(mb['host'], get_host_limits(mb['host'])) for mb in mailboxes}
+        self.tokens = OAuthTokenCache(config.get('oauth_refresh_margin', 300))
+        for mb in mailboxes:
+            if mb.get('auth', 'password') in OAUTH_METHODS:
+                self.tokens.add(mb)
+        if self.tokens.mailboxes:
+            self.tokens.start()
 
     def check_mailbox(self, mailbox: dict):
         """Check a single mailbox for unread messages."""
+        host = self.hosts[mailbox['host']]
+        if not host.circuit.allow():
+            logging.info(f"Skipping {mailbox['email']}: circuit for {mailbox['host']} is {host.circuit.state}")
+            return -1
         try:
-            password = get_password(mailbox['email'])
+            auth = mailbox.get('auth', 'password')
+            if auth in OAUTH_METHODS:
+                # Token comes from cache, token endpoint is only called by background thread
+                password = self.tokens.get_token(mailbox['email'])
+                if password is None:
+                    logging.warning(f"No valid OAuth2 access token for {mailbox['email']}")
+                    host.circuit.release()
+                    return -1
+            else:
+                password = get_password(mailbox['email'])
             if password:
-                with IMAPClient(mailbox['host'], timeout=30, ssl=True, ssl_context=ssl.create_default_context()) as server:
-                    server.login(mailbox['username'], password)
+                compress = mailbox.get('compress', True)
+                host.acquire_check(4 if compress else 3)  # LOGIN, COMPRESS, SELECT, SEARCH
+                with FactoryIMAPClient(mailbox['host'], self.connections, timeout=30) as server:
+                    self.login(server, mailbox, password)
+                    if compress and server.has_capability('COMPRESS=DEFLATE'):
+                        self.enable_compression(server, mailbox)
+                    elif compress:
+                        host.commands.refund()  # COMPRESS not sent
                     server.select_folder(mailbox.get('folder', 'INBOX'))
                     unread = server.search('UNSEEN')
+                    host.circuit.record_success()
                     self.error_counters[mailbox['email']] = 0  # Reset on success
                     logging.info(f"{mailbox['email']}: {len(unread)} unread")
                     return len(unread)
+            host.circuit.release()
+            return None
+        except RateLimitExceeded as e:
+            host.circuit.release()
+            logging.warning(f"Skipping {mailbox['email']} this round: {e}")
+            return None
         except ssl.SSLError as e:
+            host.circuit.record_failure()
             logging.error(f"SSL/TLS connection failed for {mailbox['host']}: {e}")
             return -1
         except Exception as e:
+            if isinstance(e, (OSError, IMAPClientAbortError)):
+                host.circuit.record_failure()  # Connection level problem, host is unreachable
+            elif isinstance(e, IMAPClientError):
+                host.circuit.record_success()  # Host answered, the problem is with the account
+            else:
+                host.circuit.release()
+            if host.circuit.state != CircuitBreaker.CLOSED:
+                # Host is down, circuit breaker decides when to retry
+                logging.warning(f"Check of {mailbox['email']} failed: {e}")
+                return -1
             err_count = self.error_counters[mailbox['email']] + 1
             self.error_counters[mailbox['email']] = err_count
-            wait = min(300, 5 * 2 ** err_count)  # Exponential error retry
-            logging.warning(f"Will retry {mailbox['email']} in {wait}s: {e}")
-            time.sleep(wait)
+            # Worker is not held for the backoff, scheduler delays the next check instead
+            logging.warning(f"Will retry {mailbox['email']} in {self.retry_delay(mailbox['email'])}s: {e}")
             return -1
 
+    def retry_delay(self, email: str) -> float:
+        """Get exponential backoff before next check of a failing mailbox, 0 if it is fine."""
+        err_count = self.error_counters.get(email, 0)
+        return min(300, 5 * 2 ** err_count) if err_count else 0
+
+    def login(self, server: FactoryIMAPClient, mailbox: dict, secret: str):
+        """Log in with password or OAuth2 access token, depending on mailbox auth."""
+        auth = mailbox.get('auth', 'password')
+        try:
+            if auth == 'xoauth2':
+                server.oauth2_login(mailbox['username'], secret)
+            elif auth == 'oauthbearer':
+                server.oauthbearer_login(mailbox['username'], secret)
+            else:
+                server.login(mailbox['username'], secret)
+        except LoginError:
+            if auth in OAUTH_METHODS:
+                self.tokens.invalidate(mailbox['email'])  # Token may be revoked, get a new one
+            raise
+
+    @staticmethod
+    def enable_compression(server: FactoryIMAPClient, mailbox: dict):
+        """Try to enable COMPRESS=DEFLATE, continue uncompressed if server refuses."""
+        try:
+            server.compress()
+            logging.debug(f"{mailbox['email']}: COMPRESS=DEFLATE enabled")
+        except IMAPClientError as e:
+            logging.warning(f"{mailbox['email']}: COMPRESS=DEFLATE failed, continuing uncompressed: {e}")
+
     def check_all(self):
         """Check all mailboxes using thread pool"""
         # Map futures to email identifiers
@@ -187,11 +800,17 @@ class MailChecker:
             email = futures[future]
             results[email] = future.result()
 
-        # Update state with thread safety
+        self.record_results(results)
+        self.connections.log_stats()
+
+    def record_results(self, results: Dict[str, Optional[int]]):
+        """Store results of mailbox checks as one update."""
         with self.lock:
             self.previous_unread_counts = dict(self.unread_counts)  # Preserve previous state
-        self.unread_counts.update(results)  # Merge new results
-        self.last_check = time.time()
+            for email, count in results.items():
+                if count is not None:  # None means check was skipped, keep last known value
+                    self.unread_counts[email] = count
+            self.last_check = time.time()
 
     def get_status(self) -> Dict[str, int]:
         """Get current mailbox status."""
@@ -203,6 +822,11 @@ class MailChecker:
         with self.lock:
             return dict(self.previous_unread_counts)
 
+    def get_host_states(self) -> Dict[str, str]:
+        """Get circuit state of hosts which are not healthy."""
+        return {host: limiter.circuit.state for host, limiter in self.hosts.items()
+                if limiter.circuit.state != CircuitBreaker.CLOSED}
+
     def has_new_unread_messages(self) -> bool:
         """Check if there are new unread messages since last check."""
         current = self.get_status()
@@ -218,9 +842,121 @@ class MailChecker:
     def stop(self):
         """Stop the mail checker."""
         self.running = False
+        self.tokens.stop()
         self.executor.shutdown(wait=True, cancel_futures=True)
 
 
+class CheckScheduler:
+    """Spreads mailbox checks evenly over the check interval instead of checking all at once."""
+
+    def __init__(self, checker: MailChecker, on_result: Callable[[], None],
+                 jitter: float = 0.05, startup_ramp: float = 30):
+        self.checker = checker
+        self.on_result = on_result
+        self.jitter = jitter
+        self.startup_ramp = startup_ramp
+        self.start = time.monotonic()
+        self.lock = threading.Lock()  # Guards next_due, in_flight and results
+        self.wakeup = threading.Event()
+        self.in_flight: set = set()
+        self.results: Dict[str, Optional[int]] = {}  # Finished checks not yet shown in tray
+        self.phases = self.spread_phases([mb['email'] for mb in checker.mailboxes])
+        # First checks are spread over the startup ramp, not fired at once
+        ramp = min(startup_ramp, self.interval())
+        self.next_due = {mb['email']: self.start + self.phases[mb['email']] * ramp for mb in checker.mailboxes}
+
+    @staticmethod
+    def interval() -> float:
+        # 15 seconds is the minimum interval, to avoid too aggressive polling
+        return max(15, CHECK_INTERVAL)
+
+    @staticmethod
+    def stable_hash(value: str) -> float:
+        """Map string to a stable number in range [0, 1)."""
+        return int.from_bytes(hashlib.sha1(value.encode('utf-8')).digest()[:8], 'big') / 2 ** 64
+
+    @classmethod
+    def spread_phases(cls, emails: List[str]) -> Dict[str, float]:
+        """Give every mailbox its own evenly spaced position within the interval, in range [0, 1)."""
+        # Stable order by hash, so adding a mailbox moves the others as little as possible
+        order = sorted(emails, key=cls.stable_hash)
+        # Per machine shift within a slot, so instances sharing a mailbox don't check it in sync
+        offset = cls.stable_hash(socket.gethostname())
+        return {email: (rank + offset) / len(order) for rank, email in enumerate(order)}
+
+    def schedule_next(self, email: str, now: float) -> float:
+        """Get time of the next mailbox check: its next phase slot plus jitter."""
+        interval = self.interval()
+        phase = self.phases[email]
+        # First slot at least half an interval away, so a check finished early is not repeated at once
+        slot = math.ceil((now + interval / 2 - self.start) / interval - phase)
+        next_slot = self.start + (slot + phase) * interval
+        jitter = random.uniform(-self.jitter, self.jitter) * interval
+        return max(now + 1, next_slot + jitter)
+
+    def due_mailboxes(self, now: float) -> List[dict]:
+        """Get mailboxes which should be checked now and mark them in flight."""
+        with self.lock:
+            due = [mb for mb in self.checker.mailboxes
+                   if self.next_due[mb['email']] <= now and mb['email'] not in self.in_flight]
+            self.in_flight.update(mb['email'] for mb in due)
+        return due
+
+    def on_done(self, mailbox: dict, future: Future):
+        """Queue check result for scheduler thread and schedule the next check of the mailbox."""
+        email = mailbox['email']
+        now = time.monotonic()
+        with self.lock:
+            # Failing mailbox is not checked again before its backoff passes
+            self.next_due[email] = max(self.schedule_next(email, now), now + self.checker.retry_delay(email))
+            self.in_flight.discard(email)
+            if future.cancelled() or not self.checker.running:
+                return
+            self.results[email] = future.result()
+        # Tray update (and sound) runs in scheduler thread, worker is free at once
+        self.wakeup.set()
+
+    def process_results(self):
+        """Store queued results and update tray once for all of them."""
+        with self.lock:
+            results, self.results = self.results, {}
+        if results:
+            self.checker.record_results(results)
+            self.on_result()
+
+    def check_now(self):
+        """Make every mailbox which is not being checked already due immediately."""
+        now = time.monotonic()
+        with self.lock:
+            for email in self.next_due:
+                if email not in self.in_flight:
+                    self.next_due[email] = now
+        self.wakeup.set()
+
+    def run(self):
+        """Submit mailbox checks as they become due, until checker is stopped."""
+        last_stats = time.monotonic()
+        while self.checker.running:
+            self.process_results()
+            now = time.monotonic()
+            for mailbox in self.due_mailboxes(now):
+                try:
+                    future = self.checker.executor.submit(self.checker.check_mailbox, mailbox)
+                except RuntimeError:
+                    return  # Executor was shut down
+                future.add_done_callback(partial(self.on_done, mailbox))
+
+            if now - last_stats >= self.interval():
+                self.checker.connections.log_stats()
+                last_stats = now
+
+            # Sleep until next due check, in chunks to respond to shutdown faster
+            with self.lock:
+                next_due = min(self.next_due.values(), default=now + 1)
+            self.wakeup.wait(min(1, max(0.05, next_due - time.monotonic())))
+            self.wakeup.clear()
+
+
 def load_and_color_icon(
     icon_name: str,
     color: Tuple[int, int, int, int],
@@ -266,6 +1002,7 @@ class TrayIconManager:
     def __init__(self, checker: MailChecker):
         self.icons = self.load_icons()
         self.checker = checker
+        self.scheduler: Optional[CheckScheduler] = None  # Set when checks run on schedule
 
         # def on_double_click(icon: Any) -> None:
         #     webbrowser.open(self.checker.mailboxes[0]['web_url'])
@@ -366,6 +1103,8 @@ class TrayIconManager:
                 messages.append(f"{email}: error")
             elif count > 0:
                 messages.append(f"{count} unread in {email}")
+        for host, state in self.checker.get_host_states().items():
+            messages.append(f"{host}: circuit {state}")
 
         self.icon.title = "\n".join(messages) if messages else "No new mail"
 
@@ -385,6 +1124,10 @@ class TrayIconManager:
     def check_now(self, icon, item):
         """Manual check trigger."""
         logging.info("Manual check triggered")
+        if self.scheduler is not None:
+            # Mailboxes already being checked are skipped, icon updates as results arrive
+            self.scheduler.check_now()
+            return
         self.checker.check_all()
         self.update_icon()
 
@@ -417,20 +1160,17 @@ def main():
     checker = MailChecker(MAILBOXES)
     tray_manager = TrayIconManager(checker)
 
+    scheduler = CheckScheduler(
+        checker,
+        tray_manager.update_icon,
+        config.get('schedule_jitter', 0.05),
+        config.get('startup_ramp', 30)
+    )
+    tray_manager.scheduler = scheduler
+
     def check_loop():
         try:
-            while checker.running:
-                checker.check_all()
-                tray_manager.update_icon()
-                elapsed = time.time() - checker.last_check
-                # 15 seconds is the minimum interval, to avoid too aggressive polling
-                sleep_time = max(15, CHECK_INTERVAL - elapsed)
-
-                # Sleep in chunks to respond to shutdown faster
-                for _ in range(int(sleep_time)):
-                    if not checker.running:
-                        return
-                    time.sleep(1)
+            scheduler.run()
         except Exception as e:
             logging.exception(f"Check loop crashed:{e}")
         finally:
@@ -0,0 +1,219 @@
+from mail_notifier import ConnectionFactory, FactoryIMAP4TLS
+import threading
+import pytest
+import socket
+import ssl
+import zlib
+
+
+ADDRESSES = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('127.0.0.1', 993))]
+
+
+def test_resolve_uses_cache(mocker):
+    mock_getaddrinfo = mocker.patch('socket.getaddrinfo', return_value=ADDRESSES)
+    factory = ConnectionFactory(dns_ttl=300)
+
+    assert factory.resolve('mail.inbox.lt', 993) == ADDRESSES
+    assert factory.resolve('mail.inbox.lt', 993) == ADDRESSES
+    mock_getaddrinfo.assert_called_once()
+
+
+def test_resolve_after_ttl_expired(mocker):
+    mock_getaddrinfo = mocker.patch('socket.getaddrinfo', return_value=ADDRESSES)
+    factory = ConnectionFactory(dns_ttl=0)
+
+    factory.resolve('mail.inbox.lt', 993)
+    factory.resolve('mail.inbox.lt', 993)
+    assert mock_getaddrinfo.call_count == 2
+
+
+def test_forget_drops_cached_host(mocker):
+    mock_getaddrinfo = mocker.patch('socket.getaddrinfo', return_value=ADDRESSES)
+    factory = ConnectionFactory(dns_ttl=300)
+    factory.tls_sessions[('mail.inbox.lt', 993)] = mocker.MagicMock()
+
+    factory.resolve('mail.inbox.lt', 993)
+    factory.forget('mail.inbox.lt', 993)
+    factory.resolve('mail.inbox.lt', 993)
+
+    assert mock_getaddrinfo.call_count == 2
+    assert ('mail.inbox.lt', 993) not in factory.tls_sessions
+
+
+def mock_tls(mocker, factory, session_reused):
+    """Mock TCP connect and TLS wrapping, return mocked wrap_socket."""
+    mocker.patch('socket.getaddrinfo', return_value=ADDRESSES)
+    mocker.patch('socket.socket')
+    tls_sock = mocker.MagicMock(session_reused=session_reused)
+    tls_sock.session.has_ticket = True
+    return mocker.patch.object(factory.ssl_context, 'wrap_socket', return_value=tls_sock)
+
+
+def test_open_socket_full_handshake(mocker):
+    factory = ConnectionFactory()
+    wrap_socket = mock_tls(mocker, factory, session_reused=False)
+
+    tls_sock = factory.open_socket('mail.inbox.lt', 993, timeout=5)
+
+    assert wrap_socket.call_args.kwargs['session'] is None
+    assert wrap_socket.call_args.kwargs['server_hostname'] == 'mail.inbox.lt'
+    assert factory.tls_sessions[('mail.inbox.lt', 993)] is tls_sock.session
+    stats = factory.get_stats()
+    assert stats['handshakes'] == 1
+    assert stats['resumed'] == 0
+
+
+def test_open_socket_resumes_session(mocker):
+    factory = ConnectionFactory()
+    session = mocker.MagicMock(has_ticket=True)
+    factory.tls_sessions[('mail.inbox.lt', 993)] = session
+    wrap_socket = mock_tls(mocker, factory, session_reused=True)
+
+    factory.open_socket('mail.inbox.lt', 993, timeout=5)
+
+    assert wrap_socket.call_args.kwargs['session'] is session
+    stats = factory.get_stats()
+    assert stats['handshakes'] == 0
+    assert stats['resumed'] == 1
+
+
+def test_store_session_without_ticket(mocker):
+    factory = ConnectionFactory()
+    tls_sock = mocker.MagicMock()
+    tls_sock.session.has_ticket = False
+    tls_sock.session.id = b''
+
+    factory.store_session('mail.inbox.lt', 993, tls_sock)
+    assert ('mail.inbox.lt', 993) not in factory.tls_sessions
+
+
+def test_open_socket_tls_failure_forgets_host(mocker):
+    factory = ConnectionFactory()
+    wrap_socket = mock_tls(mocker, factory, session_reused=False)
+    wrap_socket.side_effect = ssl.SSLError('handshake failed')
+    factory.tls_sessions[('mail.inbox.lt', 993)] = mocker.MagicMock()
+
+    with pytest.raises(ssl.SSLError):
+        factory.open_socket('mail.inbox.lt', 993, timeout=5)
+
+    assert ('mail.inbox.lt', 993) not in factory.tls_sessions
+    assert ('mail.inbox.lt', 993) not in factory.dns_cache
+    assert factory.get_stats()['handshakes'] == 0
+
+
+def fake_server(sock):
+    """Answer IMAP greeting and CAPABILITY, then echo one compressed command back."""
+    sock.sendall(b'* OK ready\r\n')
+    tag = sock.makefile('rb').readline().split()[0]
+    sock.sendall(b'* CAPABILITY IMAP4rev1 COMPRESS=DEFLATE\r\n' + tag + b' OK done\r\n')
+    command = zlib.decompressobj(-15).decompress(sock.recv(1024))
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    response = b'* SEARCH' + b' 1' * 1000 + b'\r\n' + command.replace(b'NOOP', b'OK')
+    sock.sendall(compressor.compress(response) + compressor.flush(zlib.Z_SYNC_FLUSH))
+
+
+def test_compressed_connection(mocker):
+    client_sock, server_sock = socket.socketpair()
+    client_sock.settimeout(5)
+    server = threading.Thread(target=fake_server, args=(server_sock,))
+    server.start()
+    factory = ConnectionFactory()
+    mocker.patch.object(factory, 'open_socket', return_value=client_sock)
+
+    connection = FactoryIMAP4TLS('localhost', 993, factory, timeout=5)
+    connection.start_compression()
+    connection.send(b'A002 NOOP\r\n')
+    assert connection.readline() == b'* SEARCH' + b' 1' * 1000 + b'\r\n'
+    assert connection.readline() == b'A002 OK\r\n'
+    server.join()
+
+    assert connection.wire_in < connection.raw_in
+    connection.shutdown()
+    stats = factory.get_stats()
+    assert stats['compressed'] == 1
+    assert stats['raw_in'] == connection.raw_in
+    assert stats['wire_out'] == connection.wire_out
+    assert stats['compressed_raw'] == connection.raw_in + connection.raw_out
+    server_sock.close()
+
+
+def test_compress_response_buffered_with_data(mocker):
+    """Compressed data arriving together with COMPRESS OK is not lost."""
+    client_sock, server_sock = socket.socketpair()
+    client_sock.settimeout(5)
+    server_sock.sendall(b'* OK ready\r\n')
+    factory = ConnectionFactory()
+    mocker.patch.object(factory, 'open_socket', return_value=client_sock)
+
+    def answer_capability():
+        tag = server_sock.makefile('rb').readline().split()[0]
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        server_sock.sendall(b'* CAPABILITY IMAP4rev1\r\n' + tag + b' OK done\r\n'
+                            + b'A002 OK compressing\r\n'
+                            + compressor.compress(b'* BYE\r\n') + compressor.flush(zlib.Z_SYNC_FLUSH))
+    server = threading.Thread(target=answer_capability)
+    server.start()
+    connection = FactoryIMAP4TLS('localhost', 993, factory, timeout=5)
+    server.join()
+
+    assert connection.readline() == b'A002 OK compressing\r\n'
+    connection.start_compression()
+    assert connection.readline() == b'* BYE\r\n'
+    server_sock.close()
+
+
+def test_readline_max_line(mocker):
+    client_sock, server_sock = socket.socketpair()
+    client_sock.settimeout(5)
+    server = threading.Thread(target=fake_server, args=(server_sock,))
+    server.start()
+    factory = ConnectionFactory()
+    mocker.patch.object(factory, 'open_socket', return_value=client_sock)
+
+    connection = FactoryIMAP4TLS('localhost', 993, factory, timeout=5)
+    connection.start_compression()
+    connection.send(b'A002 NOOP\r\n')
+    mocker.patch('imaplib._MAXLINE', 100)
+    with pytest.raises(connection.error):
+        connection.readline()  # SEARCH response is longer than 100 bytes
+    server.join()
+    server_sock.close()
+
+
+def test_uncompressed_sessions_not_in_saving(mocker):
+    factory = ConnectionFactory()
+    plain = mocker.MagicMock(decompressor=None, raw_in=1000, raw_out=10, wire_in=1000, wire_out=10)
+    compressed = mocker.MagicMock(raw_in=1000, raw_out=10, wire_in=200, wire_out=10)
+    factory.record_traffic(plain)
+    factory.record_traffic(compressed)
+
+    stats = factory.get_stats()
+    assert stats['raw_in'] == 2000
+    assert stats['compressed_raw'] == 1010
+    assert stats['compressed_wire'] == 210
+
+
+def test_inflate_is_bounded(mocker):
+    """Highly compressed line is inflated in chunks, not all at once."""
+    client_sock, server_sock = socket.socketpair()
+    client_sock.settimeout(5)
+    server_sock.sendall(b'* OK ready\r\n')
+    factory = ConnectionFactory()
+    mocker.patch.object(factory, 'open_socket', return_value=client_sock)
+
+    def answer_capability():
+        tag = server_sock.makefile('rb').readline().split()[0]
+        server_sock.sendall(b'* CAPABILITY IMAP4rev1\r\n' + tag + b' OK done\r\n')
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        server_sock.sendall(compressor.compress(b'0' * 10 ** 7) + compressor.flush(zlib.Z_SYNC_FLUSH))
+    server = threading.Thread(target=answer_capability)
+    server.start()
+    connection = FactoryIMAP4TLS('localhost', 993, factory, timeout=5)
+    connection.start_compression()
+    mocker.patch('imaplib._MAXLINE', 1000)
+
+    with pytest.raises(connection.error):
+        connection.readline()
+    assert len(connection.inflated) <= FactoryIMAP4TLS.INFLATE_CHUNK
+    server.join()
+    server_sock.close()
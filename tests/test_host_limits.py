@@ -0,0 +1,163 @@
+from mail_notifier import (MailChecker, CircuitBreaker, TokenBucket, RateLimitExceeded,
+                           get_host_limits, DEFAULT_CONFIG)
+from imapclient.exceptions import IMAPClientError, LoginError
+import pytest
+
+
+def test_token_bucket_burst():
+    bucket = TokenBucket(per_minute=1, burst=2)
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert not bucket.acquire(timeout=0)
+
+
+def test_token_bucket_count_and_refund():
+    bucket = TokenBucket(per_minute=1, burst=4)
+    assert bucket.acquire(count=3)
+    assert not bucket.acquire(timeout=0, count=2)
+    bucket.refund(2)
+    assert bucket.acquire(timeout=0, count=3)
+
+
+def test_token_bucket_unlimited():
+    bucket = TokenBucket(per_minute=0, burst=1)
+    assert all(bucket.acquire() for _ in range(10))
+
+
+def test_circuit_opens_after_threshold():
+    circuit = CircuitBreaker('not.real.host', failure_threshold=2, reset_timeout=60)
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.CLOSED
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.OPEN
+    assert not circuit.allow()
+
+
+def test_circuit_half_open_single_probe():
+    circuit = CircuitBreaker('not.real.host', failure_threshold=1, reset_timeout=60)
+    circuit.record_failure()
+    circuit.opened_at -= 60  # Reset timeout passed
+
+    assert circuit.allow()  # First mailbox probes the host
+    assert circuit.state == CircuitBreaker.HALF_OPEN
+    assert not circuit.allow()  # Others wait for the probe result
+
+    circuit.record_success()
+    assert circuit.state == CircuitBreaker.CLOSED
+    assert circuit.allow()
+
+
+def test_circuit_half_open_probe_failure():
+    circuit = CircuitBreaker('not.real.host', failure_threshold=1, reset_timeout=60)
+    circuit.record_failure()
+    circuit.opened_at -= 60
+    assert circuit.allow()
+
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.OPEN
+    assert not circuit.allow()
+
+
+def test_host_limits_override(mocker):
+    mocker.patch('mail_notifier.config', {'host_limits': {'not.real.host': {'logins_per_minute': 2}}})
+    limits = get_host_limits('not.real.host')
+    assert limits['logins_per_minute'] == 2
+    assert limits['login_burst'] == DEFAULT_CONFIG['host_limits']['default']['login_burst']
+
+
+def test_open_circuit_skips_connection(mocker, mock_mailboxes):
+    mock_client = mocker.patch('mail_notifier.FactoryIMAPClient')
+    checker = MailChecker(mock_mailboxes)
+    circuit = checker.hosts['not.real.host'].circuit
+    for _ in range(circuit.failure_threshold):
+        circuit.record_failure()
+
+    assert checker.check_mailbox(mock_mailboxes[1]) == -1
+    mock_client.assert_not_called()
+    assert checker.get_host_states() == {'not.real.host': CircuitBreaker.OPEN}
+
+
+@pytest.fixture
+def imap_checker(mocker, mock_mailboxes):
+    """Checker with mocked password and IMAP client."""
+    mocker.patch('mail_notifier.get_password', return_value='secret')
+    client = mocker.patch('mail_notifier.FactoryIMAPClient')
+    server = client.return_value.__enter__.return_value
+    server.has_capability.return_value = False
+    server.search.return_value = [1, 2]
+    checker = MailChecker(mock_mailboxes)
+    return checker, client, server
+
+
+def test_check_mailbox_success(imap_checker, mock_mailboxes):
+    checker, _, _ = imap_checker
+    assert checker.check_mailbox(mock_mailboxes[1]) == 2
+
+
+def test_connection_failures_open_circuit(imap_checker, mock_mailboxes):
+    checker, client, _ = imap_checker
+    client.side_effect = OSError('Connection refused')
+    circuit = checker.hosts['not.real.host'].circuit
+
+    for _ in range(circuit.failure_threshold):
+        assert checker.check_mailbox(mock_mailboxes[1]) == -1
+    assert circuit.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.parametrize('error', [IMAPClientError('select failed: no such folder'), LoginError('bad password')])
+def test_account_errors_keep_circuit_closed(imap_checker, mock_mailboxes, error):
+    checker, _, server = imap_checker
+    server.select_folder.side_effect = error
+    server.login.side_effect = error if isinstance(error, LoginError) else None
+    circuit = checker.hosts['not.real.host'].circuit
+
+    for _ in range(circuit.failure_threshold + 1):
+        assert checker.check_mailbox(mock_mailboxes[1]) == -1
+    assert circuit.state == CircuitBreaker.CLOSED
+    assert circuit.failures == 0
+
+
+def test_rate_limited_check_releases_probe(imap_checker, mock_mailboxes, mocker):
+    checker, client, _ = imap_checker
+    host = checker.hosts['not.real.host']
+    mocker.patch.object(host, 'acquire_check', side_effect=RateLimitExceeded('Login rate limit'))
+    host.circuit.state = CircuitBreaker.HALF_OPEN
+
+    assert checker.check_mailbox(mock_mailboxes[1]) is None
+    client.assert_not_called()
+    assert host.circuit.probe_started is None
+    assert host.circuit.allow()  # Next mailbox can probe at once
+
+
+def test_missing_password_releases_probe(imap_checker, mock_mailboxes, mocker):
+    checker, client, _ = imap_checker
+    mocker.patch('mail_notifier.get_password', return_value=None)
+    circuit = checker.hosts['not.real.host'].circuit
+    circuit.state = CircuitBreaker.HALF_OPEN
+
+    assert checker.check_mailbox(mock_mailboxes[1]) is None
+    client.assert_not_called()
+    assert circuit.allow()
+
+
+def test_account_error_does_not_sleep(imap_checker, mock_mailboxes, mocker):
+    checker, _, server = imap_checker
+    mock_sleep = mocker.patch('mail_notifier.time.sleep')
+    server.login.side_effect = LoginError('bad password')
+
+    assert checker.check_mailbox(mock_mailboxes[1]) == -1
+    mock_sleep.assert_not_called()
+    assert checker.retry_delay('dummy@mail.test') == 10
+    assert checker.retry_delay('test_email_notifier@inbox.lt') == 0
+
+
+def test_rate_limit_checked_before_connecting(imap_checker, mock_mailboxes):
+    checker, client, _ = imap_checker
+    host = checker.hosts['not.real.host']
+    host.max_wait = 0
+    host.commands.acquire(count=host.commands.burst - 2)  # Not enough for a whole check
+    logins = host.logins.tokens
+
+    assert checker.check_mailbox(mock_mailboxes[1]) is None
+    client.assert_not_called()
+    assert host.logins.tokens == logins  # No login spent
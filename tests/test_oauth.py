@@ -0,0 +1,183 @@
+from mail_notifier import MailChecker, OAuthTokenCache, prepare_mailboxes
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from imapclient.exceptions import LoginError
+from urllib.parse import parse_qs
+import threading
+import pytest
+import json
+import time
+
+
+class TokenHandler(BaseHTTPRequestHandler):
+    """Local stand-in for OAuth2 token endpoint."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        self.server.requests.append(parse_qs(body))
+        data = {'access_token': f"token-{len(self.server.requests)}", 'expires_in': self.server.expires_in}
+        if self.server.refresh_token:
+            data['refresh_token'] = self.server.refresh_token
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def token_server():
+    server = HTTPServer(('127.0.0.1', 0), TokenHandler)
+    server.requests = []
+    server.expires_in = 3600
+    server.refresh_token = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def oauth_mailbox(token_server, mocker):
+    mocker.patch('mail_notifier.get_password', return_value='refresh-token')
+    return {
+        'email': 'oauth@mail.test',
+        'host': 'outlook.office365.com',
+        'username': 'oauth@mail.test',
+        'auth': 'xoauth2',
+        'oauth': {
+            'token_url': f"http://127.0.0.1:{token_server.server_port}/token",
+            'client_id': 'client-id',
+            'scope': 'https://outlook.office.com/IMAP.AccessAsUser.All offline_access',
+        }
+    }
+
+
+def test_refresh_token_request(token_server, oauth_mailbox):
+    tokens = OAuthTokenCache()
+    tokens.add(oauth_mailbox)
+
+    assert tokens.refresh(oauth_mailbox) == 'token-1'
+    assert tokens.get_token('oauth@mail.test') == 'token-1'
+    request = token_server.requests[0]
+    assert request['grant_type'] == ['refresh_token']
+    assert request['refresh_token'] == ['refresh-token']
+    assert request['client_id'] == ['client-id']
+
+
+def test_background_refresh_before_expiry(token_server, oauth_mailbox):
+    token_server.expires_in = 2  # Refreshed after half of lifetime
+    tokens = OAuthTokenCache(refresh_margin=300)
+    tokens.add(oauth_mailbox)
+    tokens.start()
+    try:
+        assert tokens.get_token('oauth@mail.test') == 'token-1'
+        time.sleep(1.5)
+        assert tokens.get_token('oauth@mail.test', wait=0) == 'token-2'
+    finally:
+        tokens.stop()
+
+
+def test_failed_refresh_does_not_block(oauth_mailbox):
+    oauth_mailbox['oauth']['token_url'] = 'http://127.0.0.1:1/token'  # Connection refused
+    tokens = OAuthTokenCache()
+    tokens.add(oauth_mailbox)
+    tokens.start()
+    try:
+        started = time.monotonic()
+        assert tokens.get_token('oauth@mail.test', wait=10) is None
+        assert time.monotonic() - started < 5
+        assert tokens.get_token('oauth@mail.test', wait=10) is None  # Retry postponed, no wait
+        assert tokens.error_counters['oauth@mail.test'] == 1
+    finally:
+        tokens.stop()
+
+
+def test_check_mailbox_uses_cached_token(token_server, oauth_mailbox, mocker):
+    client = mocker.patch('mail_notifier.FactoryIMAPClient')
+    server = client.return_value.__enter__.return_value
+    server.has_capability.return_value = False
+    server.search.return_value = [1]
+    checker = MailChecker([oauth_mailbox])
+    try:
+        assert checker.tokens.get_token('oauth@mail.test') == 'token-1'
+        requests = len(token_server.requests)
+
+        assert checker.check_mailbox(oauth_mailbox) == 1
+        assert checker.check_mailbox(oauth_mailbox) == 1
+        server.oauth2_login.assert_called_with('oauth@mail.test', 'token-1')
+        server.login.assert_not_called()
+        assert len(token_server.requests) == requests  # No token endpoint calls on check
+    finally:
+        checker.stop()
+
+
+@pytest.fixture
+def mock_keyring(mocker):
+    """Keyring stored in dict."""
+    store = {}
+    keyring = mocker.patch('mail_notifier.keyring')
+    keyring.get_password.side_effect = lambda service, name: store.get((service, name))
+    keyring.set_password.side_effect = lambda service, name, value: store.__setitem__((service, name), value)
+    keyring.delete_password.side_effect = lambda service, name: store.pop((service, name))
+    return store
+
+
+def test_rotated_refresh_token_kept_on_restart(token_server, oauth_mailbox, mock_keyring, mocker, monkeypatch):
+    monkeypatch.setenv('oauth@mail.test', 'refresh-token')
+    mocker.patch('mail_notifier.get_password', side_effect=lambda email: mock_keyring.get(('email_notifier', email)))
+    token_server.refresh_token = 'rotated-token'
+    prepare_mailboxes([oauth_mailbox])
+    OAuthTokenCache().refresh(oauth_mailbox)
+
+    prepare_mailboxes([oauth_mailbox])  # Restart with the same .env
+    OAuthTokenCache().refresh(oauth_mailbox)
+    assert token_server.requests[1]['refresh_token'] == ['rotated-token']
+
+    monkeypatch.setenv('oauth@mail.test', 'new-refresh-token')
+    prepare_mailboxes([oauth_mailbox])  # Mailbox authorized again
+    OAuthTokenCache().refresh(oauth_mailbox)
+    assert token_server.requests[2]['refresh_token'] == ['new-refresh-token']
+
+
+def test_client_secret_from_env(token_server, oauth_mailbox, mock_keyring, monkeypatch):
+    monkeypatch.setenv('oauth@mail.test', 'refresh-token')
+    monkeypatch.setenv('oauth@mail.test:client_secret', 'client-secret')
+    prepare_mailboxes([oauth_mailbox])
+    OAuthTokenCache().refresh(oauth_mailbox)
+    assert token_server.requests[0]['client_secret'] == ['client-secret']
+
+    monkeypatch.delenv('oauth@mail.test:client_secret')
+    prepare_mailboxes([oauth_mailbox])  # Secret removed from .env
+    OAuthTokenCache().refresh(oauth_mailbox)
+    assert 'client_secret' not in token_server.requests[1]
+
+
+def test_client_secret_in_config_rejected(oauth_mailbox):
+    oauth_mailbox['oauth']['client_secret'] = 'client-secret'
+    with pytest.raises(ValueError):
+        prepare_mailboxes([oauth_mailbox])
+
+
+def test_oauth_config_missing_token_url(oauth_mailbox):
+    del oauth_mailbox['oauth']['token_url']
+    with pytest.raises(ValueError):
+        prepare_mailboxes([oauth_mailbox])
+
+
+def test_rejected_token_is_invalidated(token_server, oauth_mailbox, mocker):
+    mocker.patch('mail_notifier.time.sleep')
+    client = mocker.patch('mail_notifier.FactoryIMAPClient')
+    server = client.return_value.__enter__.return_value
+    server.oauth2_login.side_effect = LoginError('AUTHENTICATE failed')
+    checker = MailChecker([oauth_mailbox])
+    try:
+        checker.tokens.get_token('oauth@mail.test')
+        mock_invalidate = mocker.patch.object(checker.tokens, 'invalidate')
+        assert checker.check_mailbox(oauth_mailbox) == -1
+        mock_invalidate.assert_called_once_with('oauth@mail.test')
+    finally:
+        checker.stop()
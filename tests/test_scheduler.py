@@ -0,0 +1,112 @@
+from mail_notifier import CheckScheduler
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+import time
+import pytest
+
+
+@pytest.fixture
+def scheduler(mock_checker, mocker):
+    mocker.patch('mail_notifier.CHECK_INTERVAL', 60)
+    return CheckScheduler(mock_checker, MagicMock(), jitter=0.05, startup_ramp=30)
+
+
+def test_phase_is_stable(mock_mailboxes):
+    emails = [mb['email'] for mb in mock_mailboxes]
+    phases = CheckScheduler.spread_phases(emails)
+    assert all(0 <= phase < 1 for phase in phases.values())
+    assert phases == CheckScheduler.spread_phases(list(reversed(emails)))
+
+
+@pytest.mark.parametrize('count', [2, 10, 40])
+def test_phases_evenly_spaced(count):
+    phases = sorted(CheckScheduler.spread_phases([f"user{i}@mail.test" for i in range(count)]).values())
+    gaps = [b - a for a, b in zip(phases, phases[1:])] + [1 - phases[-1] + phases[0]]
+    assert min(gaps) == pytest.approx(1 / count)
+
+
+def test_startup_ramp(scheduler):
+    for due in scheduler.next_due.values():
+        assert scheduler.start <= due < scheduler.start + 30
+
+
+def test_schedule_next_keeps_phase(scheduler, mock_mailboxes):
+    email = mock_mailboxes[0]['email']
+    phase_time = scheduler.phases[email] * 60
+    for now in [scheduler.start + 10, scheduler.start + 100, scheduler.start + 1000]:
+        due = scheduler.schedule_next(email, now)
+        assert 30 - 3 <= due - now <= 90 + 3  # Half to one and a half interval, plus jitter
+        # Due time stays near the mailbox phase slot
+        offset = (due - scheduler.start - phase_time) % 60
+        assert min(offset, 60 - offset) <= 3
+
+
+def test_due_mailboxes_not_resubmitted(scheduler):
+    now = scheduler.start + 30
+    assert len(scheduler.due_mailboxes(now)) == 2
+    assert scheduler.due_mailboxes(now) == []  # Already in flight
+
+
+def test_on_done_records_result(scheduler, mock_mailboxes):
+    mailbox = mock_mailboxes[0]
+    scheduler.due_mailboxes(scheduler.start + 30)
+    future = Future()
+    future.set_result(5)
+
+    scheduler.on_done(mailbox, future)
+    scheduler.on_result.assert_not_called()  # Tray is updated by scheduler thread
+    scheduler.process_results()
+
+    assert scheduler.checker.get_status()[mailbox['email']] == 5
+    assert scheduler.checker.has_new_unread_messages()
+    assert mailbox['email'] not in scheduler.in_flight
+    assert scheduler.next_due[mailbox['email']] > scheduler.start + 30
+    scheduler.on_result.assert_called_once()
+
+
+def test_on_done_skipped_check_keeps_value(scheduler, mock_mailboxes):
+    mailbox = mock_mailboxes[0]
+    scheduler.checker.unread_counts[mailbox['email']] = 3
+    future = Future()
+    future.set_result(None)
+
+    scheduler.on_done(mailbox, future)
+    scheduler.process_results()
+    assert scheduler.checker.get_status()[mailbox['email']] == 3
+
+
+def test_check_now_skips_in_flight(scheduler, mock_mailboxes):
+    busy, idle = mock_mailboxes[0]['email'], mock_mailboxes[1]['email']
+    scheduler.in_flight.add(busy)
+    for email in scheduler.next_due:
+        scheduler.next_due[email] = scheduler.start + 1000
+
+    scheduler.check_now()
+
+    due = scheduler.due_mailboxes(scheduler.start + 30)
+    assert [mb['email'] for mb in due] == [idle]
+    assert scheduler.wakeup.is_set()
+
+
+def test_results_merged_into_one_update(scheduler, mock_mailboxes):
+    for mailbox, count in zip(mock_mailboxes, [5, 2]):
+        future = Future()
+        future.set_result(count)
+        scheduler.on_done(mailbox, future)
+    assert scheduler.wakeup.is_set()
+
+    scheduler.process_results()
+    scheduler.process_results()  # Nothing new, no update
+
+    scheduler.on_result.assert_called_once()
+    assert scheduler.checker.get_status() == {'test_email_notifier@inbox.lt': 5, 'dummy@mail.test': 2}
+
+
+def test_on_done_applies_backoff(scheduler, mock_mailboxes):
+    email = mock_mailboxes[1]['email']
+    scheduler.checker.error_counters[email] = 6  # Backoff capped at 300s
+    future = Future()
+    future.set_result(-1)
+
+    scheduler.on_done(mock_mailboxes[1], future)
+    assert scheduler.next_due[email] >= time.monotonic() + 299
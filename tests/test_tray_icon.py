@@ -147,3 +147,20 @@ def test_quit(mocker, mock_icon_manager, mock_checker):
     # Cheking calls
     mock_stop.assert_called_once()
     mock_icon_stop.assert_called_once()
+
+
+def test_update_icon_host_circuit(mock_icon_manager, mocker):
+    status = {'test_email_notifier@inbox.lt': 0, 'dummy@mail.test': -1}
+    mocker.patch.object(mock_icon_manager.checker, 'get_status', return_value=status)
+    mocker.patch.object(mock_icon_manager.checker, 'get_host_states', return_value={'not.real.host': 'open'})
+    mock_icon_manager.update_icon()
+    assert mock_icon_manager.icon.title == "dummy@mail.test: error\nnot.real.host: circuit open"
+
+
+def test_manual_check_with_scheduler(mock_icon_manager, mocker):
+    mock_check_all = mocker.patch.object(mock_icon_manager.checker, 'check_all')
+    mock_icon_manager.scheduler = mocker.MagicMock()
+
+    mock_icon_manager.check_now(None, None)
+    mock_icon_manager.scheduler.check_now.assert_called_once()
+    mock_check_all.assert_not_called()